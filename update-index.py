@@ -9,11 +9,62 @@ Usage:
     python update-index.py
 """
 
+import hashlib
+import json
 import os
 import re
-import json
-from pathlib import Path
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSON_DECODE_ERRORS = (orjson.JSONDecodeError, json.JSONDecodeError)
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+# Digest of the workflow data and index.html content from the last update
+CACHE_FILE = Path('.index.cache')
+
+# Workflow run directories are named YYYY-MM-DD-RUNID
+_WORKFLOW_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})-(\d+)$')
+
+# Patterns used to patch index.html
+_INDEX_PATCH_RE = re.compile(
+    r'(?P<data>const workflow(?:Directories|Data) = \[).*?\];'
+    r'|(?P<index_set>[ \t]*const workflowsWithIndex = new Set\(\[.*?\]\);[ \t]*\n?)'
+    r'|(?P<check_indent>[ \t]*)(?P<check>function checkForIndex\(workflowName\) \{.*?return ).*?(?P<check_end>;.*?\})'
+    r'|Last updated: \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} \| Auto-generated from directory scan'
+    r'|Generated on <span id="current-date"></span>',
+    re.DOTALL
+)
+
+# datetime.fromisoformat() accepts a trailing 'Z' from Python 3.11 onwards
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+
+def _json_dumps(obj, sort_keys=False):
+    """Serialize obj as JSON that is safe to embed in a <script> block.
+
+    '</' is escaped so a value cannot close the script element, and ';' so
+    the patterns above never see a statement end inside a string value.
+    """
+    if orjson is not None:
+        text = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode('utf-8')
+    else:
+        text = json.dumps(obj, sort_keys=sort_keys)
+    return text.replace('</', '<\\/').replace(';', '\\u003b')
+
+
+def _parse_timestamp(value):
+    """Parse an ISO 8601 timestamp as written by GitHub Actions."""
+    if not _FROMISOFORMAT_ACCEPTS_Z:
+        value = value.replace('Z', '+00:00')
+    return datetime.fromisoformat(value)
 
 
 def calculate_duration(started_at, completed_at):
@@ -22,60 +73,64 @@ def calculate_duration(started_at, completed_at):
         return None
     
     try:
-        from datetime import datetime
-        start = datetime.fromisoformat(started_at.replace('Z', '+00:00'))
-        end = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
+        start = _parse_timestamp(started_at)
+        end = _parse_timestamp(completed_at)
         duration = end - start
         
-        # Format as HH:MM:SS
-        total_seconds = int(duration.total_seconds())
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
+        # Format as HH:MM:SS (hours keep counting past 24 rather than rolling into days)
+        hours, remainder = divmod(duration.days * 86400 + duration.seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
         
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-    except Exception:
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _get_field(data, section, key):
+    """Return data[section][key], or None if either level is missing."""
+    try:
+        return data[section][key]
+    except (KeyError, TypeError):
         return None
 
 
 def load_workflow_metadata(dir_path):
     """Load workflow metadata from workflow-metadata.json if it exists."""
-    metadata_file = dir_path / 'workflow-metadata.json'
-    if metadata_file.exists():
+    metadata_file = os.path.join(dir_path, 'workflow-metadata.json')
+    if os.path.isfile(metadata_file):
         try:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Extract the requested information
-                actor = data.get('workflow', {}).get('actor', 'Unknown')
-                release_version = data.get('inputs', {}).get('release-version', 'Unknown')
-                is_downstream = data.get('inputs', {}).get('isDownstream', 'Unknown')
-
-                execution = data.get('execution', {})
-                started_at = execution.get('started_at', '').strip()
-                duration_formatted = execution.get('duration_formatted', None)
-                
-                # If no duration but we have start and end times, calculate it
-                if not duration_formatted:
-                    completed_at = execution.get('completed_at', '').strip()
-                    if started_at and completed_at:
-                        duration_formatted = calculate_duration(started_at, completed_at)
-                
-                # Clean up empty strings
-                if not started_at:
-                    started_at = None
-                if not duration_formatted:
-                    duration_formatted = None
-                
-                return {
-                    'actor': actor if actor != 'Unknown' else None,
-                    'release_version': release_version if release_version != 'Unknown' else None,
-                    'is_downstream': is_downstream if is_downstream != 'Unknown' else None,
-                    'started_at': started_at,
-                    'duration_formatted': duration_formatted
-                }
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"Warning: Could not parse metadata for {dir_path.name}: {e}")
+            with open(metadata_file, 'rb') as f:
+                data = _json_loads(f.read())
+            
+            # Extract the requested information
+            actor = _get_field(data, 'workflow', 'actor')
+            release_version = _get_field(data, 'inputs', 'release-version')
+            is_downstream = _get_field(data, 'inputs', 'isDownstream')
+
+            started_at = (_get_field(data, 'execution', 'started_at') or '').strip()
+            duration_formatted = _get_field(data, 'execution', 'duration_formatted')
+            
+            # If no duration but we have start and end times, calculate it
+            if not duration_formatted:
+                completed_at = (_get_field(data, 'execution', 'completed_at') or '').strip()
+                if started_at and completed_at:
+                    duration_formatted = calculate_duration(started_at, completed_at)
+            
+            # Clean up empty strings
+            if not started_at:
+                started_at = None
+            if not duration_formatted:
+                duration_formatted = None
+            
+            return {
+                'actor': actor,
+                'release_version': release_version,
+                'is_downstream': is_downstream,
+                'started_at': started_at,
+                'duration_formatted': duration_formatted
+            }
+        except (*_JSON_DECODE_ERRORS, KeyError) as e:
+            print(f"Warning: Could not parse metadata for {os.path.basename(dir_path)}: {e}")
     
     return {
         'actor': None,
@@ -86,47 +141,70 @@ def load_workflow_metadata(dir_path):
     }
 
 
+def _process_dir(entry, match):
+    """Collect workflow information for a workflow directory entry and its name match."""
+    year, month, day, run_id = match.groups()
+
+    # Check for index.html (summary available) and count job directories
+    has_index = False
+    job_count = 0
+    with os.scandir(entry.path) as it:
+        for child in it:
+            if child.name == 'index.html' and child.is_file():
+                has_index = True
+            elif child.is_dir(follow_symlinks=False):
+                job_count += 1
+
+    # Load workflow metadata
+    metadata = load_workflow_metadata(entry.path)
+
+    return {
+        'name': entry.name,
+        'year': year,
+        'month': month,
+        'day': day,
+        'run_id': run_id,
+        'has_index': has_index,
+        'job_count': job_count,
+        'actor': metadata['actor'],
+        'release_version': metadata['release_version'],
+        'is_downstream': metadata['is_downstream'],
+        'started_at': metadata['started_at'],
+        'duration_formatted': metadata['duration_formatted']
+    }
+
+
 def scan_workflow_directories():
     """Scan for workflow directories and collect metadata."""
-    workflows = []
-    current_dir = Path('.')
-    
-    for dir_path in sorted(current_dir.iterdir(), reverse=True):
-        if dir_path.is_dir() and dir_path.name not in ['__pycache__', '.git']:
-            # Check if it looks like a workflow directory (YYYY-MM-DD-RUNID format)
-            match = re.match(r'(\d{4})-(\d{2})-(\d{2})-(\d+)', dir_path.name)
-            if match:
-                year, month, day, run_id = match.groups()
-                
-                # Check for index.html (summary available)
-                has_index = (dir_path / 'index.html').exists()
-                
-                # Count job directories
-                job_count = len([d for d in dir_path.iterdir() if d.is_dir()])
-                
-                # Load workflow metadata
-                metadata = load_workflow_metadata(dir_path)
-                
-                workflows.append({
-                    'name': dir_path.name,
-                    'year': year,
-                    'month': month,
-                    'day': day,
-                    'run_id': run_id,
-                    'has_index': has_index,
-                    'job_count': job_count,
-                    'actor': metadata['actor'],
-                    'release_version': metadata['release_version'],
-                    'is_downstream': metadata['is_downstream'],
-                    'started_at': metadata['started_at'],
-                    'duration_formatted': metadata['duration_formatted']
-                })
-    
+    with os.scandir('.') as it:
+        entries = [entry for entry in it
+                   if entry.is_dir(follow_symlinks=False) and entry.name not in ('__pycache__', '.git')]
+
+    # Keep only workflow directories (YYYY-MM-DD-RUNID format), newest first.
+    # The run ID is compared numerically so ordering holds across digit counts.
+    candidates = []
+    for entry in entries:
+        match = _WORKFLOW_RE.match(entry.name)
+        if match:
+            candidates.append((entry, match))
+    candidates.sort(key=lambda em: (em[1].group(1), em[1].group(2), em[1].group(3), int(em[1].group(4))),
+                    reverse=True)
+
+    # Per-directory work is small-file IO, so overlap it across threads
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        workflows = list(executor.map(_process_dir,
+                                      [entry for entry, _ in candidates],
+                                      [match for _, match in candidates]))
+
     return workflows
 
 
-def update_index_html(workflows):
-    """Update the index.html file with current workflow data."""
+def update_index_html(workflows, now=None):
+    """Update the index.html file with current workflow data.
+
+    ``now`` is the 'Last updated' timestamp written to the footer; it
+    defaults to the current local time.
+    """
     index_file = Path('index.html')
     
     if not index_file.exists():
@@ -137,92 +215,81 @@ def update_index_html(workflows):
     with open(index_file, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    # Generate JavaScript data for workflows with metadata
-    js_workflows = []
-    for workflow in workflows:
-        # Create a JavaScript object with all the metadata
-        metadata_js = "{"
-        metadata_js += f"name: '{workflow['name']}'"
-        metadata_js += f", hasIndex: {str(workflow['has_index']).lower()}"
-        metadata_js += f", jobCount: {workflow['job_count']}"
-        
-        if workflow['actor']:
-            metadata_js += f", actor: '{workflow['actor']}'"
-        else:
-            metadata_js += ", actor: null"
-            
-        if workflow['release_version']:
-            metadata_js += f", releaseVersion: '{workflow['release_version']}'"
-        else:
-            metadata_js += ", releaseVersion: null"
-
-        if workflow['is_downstream']:
-            metadata_js += f", isDownstream: '{workflow['is_downstream']}'"
-        else:
-            metadata_js += ", isDownstream: null"
-
-        if workflow['started_at']:
-            metadata_js += f", startedAt: '{workflow['started_at']}'"
-        else:
-            metadata_js += ", startedAt: null"
-            
-        if workflow['duration_formatted']:
-            metadata_js += f", duration: '{workflow['duration_formatted']}'"
-        else:
-            metadata_js += ", duration: null"
-            
-        metadata_js += "}"
-        js_workflows.append(metadata_js)
-    
-    workflows_js = ',\n                '.join(js_workflows)
-    
-    # Replace the workflow directories/data array with the new workflow metadata
-    # Try both the old and new variable names
-    pattern1 = r'(const workflowDirectories = \[)(.*?)(\];)'
-    pattern2 = r'(const workflowData = \[)(.*?)(\];)'
-    
-    replacement = f'\\1\n                {workflows_js}\n            \\3'
-    
-    if re.search(pattern1, content, flags=re.DOTALL):
-        updated_content = re.sub(pattern1, replacement, content, flags=re.DOTALL)
-        # Update the variable name
-        updated_content = updated_content.replace('const workflowDirectories = [', 'const workflowData = [')
-    elif re.search(pattern2, content, flags=re.DOTALL):
-        updated_content = re.sub(pattern2, replacement, content, flags=re.DOTALL)
-    else:
-        print("Warning: Could not find workflow data array to update")
-        updated_content = content
+    # Generate JavaScript data for workflows with metadata. Each workflow is a
+    # compact JSON object (a valid JS expression that takes care of escaping),
+    # one per line to keep the page layout.
+    payload = [{
+        'name': w['name'],
+        'hasIndex': w['has_index'],
+        'jobCount': w['job_count'],
+        'actor': w['actor'] or None,
+        'releaseVersion': w['release_version'] or None,
+        'isDownstream': w['is_downstream'] or None,
+        'startedAt': w['started_at'] or None,
+        'duration': w['duration_formatted'] or None
+    } for w in workflows]
+    workflows_js = ',\n                '.join(_json_dumps(workflow) for workflow in payload)
     
     # Update the checkForIndex function with actual workflow data
     workflows_with_index = [w['name'] for w in workflows if w['has_index']]
-    index_list_js = ', '.join([f"'{name}'" for name in workflows_with_index])
+    index_set_js = f'const workflowsWithIndex = new Set({_json_dumps(workflows_with_index)});'
     
-    # Replace the checkForIndex function
-    check_for_index_pattern = r'(function checkForIndex\(workflowName\) \{.*?return )(.*?)(\;.*?\})'
-    check_for_index_replacement = f'\\1[{index_list_js}].includes(workflowName)\\3'
+    # Update the generation timestamp while preserving the dynamic date element
+    current_time = now or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    footer_text = f'Last updated: {current_time} | Auto-generated from directory scan'
     
-    updated_content = re.sub(check_for_index_pattern, check_for_index_replacement, updated_content, flags=re.DOTALL)
+    # Replacements are built once up front; the callback below only picks one
+    data_js = f'const workflowData = [\n                {workflows_js}\n            ];'
     
-    # Update the generation timestamp while preserving the dynamic date element
-    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    pattern = r'(Last updated: \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} \| Auto-generated from directory scan)'
-    if re.search(pattern, updated_content):
-        # Update existing timestamp
-        replacement = f'Last updated: {current_time} | Auto-generated from directory scan'
-        updated_content = re.sub(pattern, replacement, updated_content)
-    else:
-        # First time update - replace the original footer
-        pattern = r'(Generated on <span id="current-date"></span>)'
-        replacement = f'Last updated: {current_time} | Auto-generated from directory scan'
-        updated_content = updated_content.replace('Generated on <span id="current-date"></span>', replacement)
+    found_data = False
+    
+    def _sub(m):
+        nonlocal found_data
+        if m.group('data') is not None:
+            # Replace the workflow directories/data array (old or new variable
+            # name) with the new workflow metadata
+            found_data = True
+            return data_js
+        if m.group('index_set') is not None:
+            # Drop any existing Set declaration, wherever it sits; a fresh one
+            # is emitted right above checkForIndex
+            return ''
+        if m.group('check') is not None:
+            # Look names up in a Set hoisted out of the function body
+            indent = m.group('check_indent')
+            return (f"{indent}{index_set_js}\n"
+                    f"{indent}{m.group('check')}workflowsWithIndex.has(workflowName){m.group('check_end')}")
+        # Existing timestamp, or the original footer on first update
+        return footer_text
     
-    # Write updated content
-    with open(index_file, 'w', encoding='utf-8') as f:
-        f.write(updated_content)
+    updated_content = _INDEX_PATCH_RE.sub(_sub, content)
+    if not found_data:
+        # Leave the page untouched rather than half-update it
+        print("Warning: Could not find workflow data array to update")
+        return False
+    
+    # Write updated content to a sibling file and rename it into place, so an
+    # interrupted run never leaves a truncated index.html behind
+    tmp_file = index_file.with_suffix('.html.tmp')
+    try:
+        tmp_file.write_text(updated_content, encoding='utf-8')
+        os.replace(tmp_file, index_file)
+    except OSError:
+        if tmp_file.exists():
+            tmp_file.unlink()
+        raise
     
     return True
 
 
+def workflows_digest(workflows, index_content):
+    """Return a short hex digest identifying the scanned workflow data and index.html content."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_json_dumps(workflows, sort_keys=True).encode('utf-8'))
+    digest.update(index_content)
+    return digest.hexdigest()
+
+
 def main():
     """Main function."""
     print("Scanning workflow directories...")
@@ -240,8 +307,19 @@ def main():
     if len(workflows) > 5:
         print(f"  ... and {len(workflows) - 5} more")
     
+    # Leave index.html untouched (and downstream caches valid) if neither the
+    # workflows nor the page itself changed since the last update
+    index_file = Path('index.html')
+    if index_file.exists() and CACHE_FILE.exists():
+        digest = workflows_digest(workflows, index_file.read_bytes())
+        if CACHE_FILE.read_text(encoding='utf-8').strip() == digest:
+            print("\nNo changes since the last update, index.html left as is")
+            return
+    
     print("\nUpdating index.html...")
-    if update_index_html(workflows):
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if update_index_html(workflows, now):
+        CACHE_FILE.write_text(workflows_digest(workflows, index_file.read_bytes()) + '\n', encoding='utf-8')
         print("✅ Successfully updated index.html")
         print("🌐 Open workflow-results/index.html in your browser to view the updated listing")
     else: